@@ -9,22 +9,62 @@
 import sys
 import os
 import argparse
+import gc
+import hashlib
 import time
 import logging
 from jsonargparse import ArgumentParser, namespace_to_dict
 
 import numpy as np
 
-from hyperion.hyp_defs import float_cpu, config_logger
+from hyperion.hyp_defs import float_cpu, set_float_cpu, config_logger
 from hyperion.utils.trial_ndx import TrialNdx
 from hyperion.utils.trial_scores import TrialScores
 from hyperion.helpers import TrialDataReader as TDR
 from hyperion.helpers import PLDAFactory as F
-from hyperion.transforms import TransformList
+from hyperion.transforms import TransformList, LNorm
 from hyperion.score_norm import AdaptSNorm as SNorm
 from hyperion.helpers import VectorReader as VR
 
 
+def load_cohort(coh_v_file, coh_list, preproc, preproc_file, cache_dir):
+    """Loads the preprocessed cohort x-vectors.
+
+    When cache_dir is given, the projected vectors are persisted to a
+    .npy keyed by the input file hashes and memory mapped on reload, so
+    the trial shards running in parallel read+project the cohort once
+    and page it in on demand afterwards.
+    """
+    if cache_dir is None:
+        vr = VR(coh_v_file, coh_list, preproc)
+        return np.ascontiguousarray(vr.read(), dtype=float_cpu())
+
+    h = hashlib.md5()
+    for f in (coh_v_file, coh_list, preproc_file):
+        if f is None:
+            continue
+        st = os.stat(f)
+        h.update(("%s:%d:%d" % (f, st.st_size, int(st.st_mtime))).encode())
+
+    cache_file = os.path.join(cache_dir, "coh-%s.npy" % h.hexdigest())
+    if os.path.isfile(cache_file):
+        logging.info("loading cached cohort projections %s" % (cache_file))
+        return np.load(cache_file, mmap_mode="r")
+
+    vr = VR(coh_v_file, coh_list, preproc)
+    x_coh = np.ascontiguousarray(vr.read(), dtype=float_cpu())
+
+    # save to a temp file and rename so concurrent shards never read a
+    # partially written cache
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = cache_file + ".%d.tmp.npy" % os.getpid()
+    np.save(tmp_file, x_coh)
+    os.replace(tmp_file, cache_file)
+    logging.info("saved cohort projections to %s" % (cache_file))
+    return x_coh
+
+
 def eval_plda(
     v_file,
     ndx_file,
@@ -35,29 +75,58 @@ def eval_plda(
     coh_list,
     coh_nbest,
     coh_nbest_discard,
+    coh_chunk_size,
+    coh_cache_dir,
     model_file,
     score_file,
     plda_type,
     pool_method,
+    use_gpu,
     **kwargs
 ):
 
+    # the scoring path is memory-bound on wide matrices, fp32 halves the
+    # bytes moved and is accurate enough for LLR scores
+    set_float_cpu("float32")
+
     logging.info("loading data")
     if preproc_file is not None:
         preproc = TransformList.load(preproc_file)
+        # project all the x-vectors through the fused transform chain
+        # on GPU when available, falls back to the NumPy path otherwise
+        preproc.use_gpu = use_gpu
     else:
         preproc = None
 
     tdr = TDR(v_file, ndx_file, enroll_file, test_file, preproc)
-    x_e, x_t, enroll, ndx = tdr.read()
-    enroll, ids_e = np.unique(enroll, return_inverse=True)
+    x_e, x_t, enroll, ids_e, ndx = tdr.read(return_enroll_ids=True)
+    x_e = np.ascontiguousarray(x_e, dtype=float_cpu())
+    x_t = np.ascontiguousarray(x_t, dtype=float_cpu())
 
     logging.info("loading plda model: %s" % (model_file))
     model = F.load_plda(plda_type, model_file)
 
     t1 = time.time()
     logging.info("computing llr")
-    scores = model.llr_Nvs1(x_e, x_t, method=pool_method, ids1=ids_e)
+    if pool_method in ("vavg", "vavg-lnorm"):
+        # pool the enrollment side and project all the embeddings into
+        # 1vs1 LLR stats once, then reuse the cached stats for the
+        # enroll-vs-test, cohort-vs-test and enroll-vs-cohort scorings
+        D_e = model.compute_stats_hard(x_e, class_ids=ids_e, return_S=False)
+        x_e_pool = D_e[1] / D_e[0][:, None]
+        x_t_p = x_t
+        if pool_method == "vavg-lnorm":
+            lnorm = LNorm()
+            x_e_pool = lnorm.predict(x_e_pool)
+            x_t_p = lnorm.predict(x_t)
+
+        stats_e = model.compute_llr_1vs1_stats(x_e_pool)
+        scores = model.llr_1vs1_from_stats(
+            stats_e, model.compute_llr_1vs1_stats(x_t_p)
+        )
+    else:
+        stats_e = None
+        scores = model.llr_Nvs1(x_e, x_t, method=pool_method, ids1=ids_e)
 
     dt = time.time() - t1
     num_trials = len(enroll) * x_t.shape[0]
@@ -67,22 +136,54 @@ def eval_plda(
     )
 
     logging.info("loading cohort data")
-    vr = VR(coh_v_file, coh_list, preproc)
-    x_coh = vr.read()
+    x_coh = load_cohort(coh_v_file, coh_list, preproc, preproc_file, coh_cache_dir)
 
     t2 = time.time()
-    logging.info("score cohort vs test")
-    scores_coh_test = model.llr_1vs1(x_coh, x_t)
     logging.info("score enroll vs cohort")
-    scores_enr_coh = model.llr_Nvs1(x_e, x_coh, method=pool_method, ids1=ids_e)
-
-    dt = time.time() - t2
-    logging.info("cohort-scoring elapsed time: %.2f s." % (dt))
+    if stats_e is None:
+        scores_enr_coh = model.llr_Nvs1(x_e, x_coh, method=pool_method, ids1=ids_e)
+    else:
+        x_coh_p = lnorm.predict(x_coh) if pool_method == "vavg-lnorm" else x_coh
+        scores_enr_coh = model.llr_1vs1_from_stats(
+            stats_e, model.compute_llr_1vs1_stats(x_coh_p)
+        )
 
-    t2 = time.time()
-    logging.info("apply s-norm")
     snorm = SNorm(nbest=coh_nbest, nbest_discard=coh_nbest_discard)
-    scores = snorm.predict(scores, scores_coh_test, scores_enr_coh)
+    if coh_chunk_size is None:
+        logging.info("score cohort vs test")
+        if stats_e is None:
+            scores_coh_test = model.llr_1vs1(x_coh, x_t)
+        else:
+            scores_coh_test = model.llr_1vs1_from_stats(
+                model.compute_llr_1vs1_stats(x_coh), model.compute_llr_1vs1_stats(x_t)
+            )
+        dt = time.time() - t2
+        logging.info("cohort-scoring elapsed time: %.2f s." % (dt))
+
+        t2 = time.time()
+        logging.info("apply s-norm")
+        scores = snorm.predict(scores, scores_coh_test, scores_enr_coh)
+        del scores_coh_test
+    else:
+        # stream the cohort vs test scores in tiles so the full
+        # (num_coh x num_test) matrix is never held in memory
+        logging.info("score cohort vs test and apply s-norm in chunks")
+        stats_t = model.compute_llr_1vs1_stats(x_t)
+
+        def coh_test_chunks():
+            for first in range(0, x_coh.shape[0], coh_chunk_size):
+                x_coh_i = x_coh[first : first + coh_chunk_size]
+                yield model.llr_1vs1_from_stats(
+                    model.compute_llr_1vs1_stats(x_coh_i), stats_t
+                )
+
+        scores = snorm.predict_from_chunks(scores, coh_test_chunks(), scores_enr_coh)
+
+    # the cohort scores can be several hundred MB, return them to the
+    # allocator before serializing the score table
+    del scores_enr_coh
+    gc.collect()
+
     dt = time.time() - t2
     logging.info("s-norm elapsed time: %.2f s." % (dt))
 
@@ -110,6 +211,12 @@ if __name__ == "__main__":
     parser.add_argument("--coh-list", required=True)
     parser.add_argument("--coh-nbest", type=int, default=100)
     parser.add_argument("--coh-nbest-discard", type=int, default=0)
+    parser.add_argument("--coh-chunk-size", type=int, default=None)
+    parser.add_argument(
+        "--coh-cache-dir",
+        default=None,
+        help=("dir to cache the preprocessed cohort x-vectors as mmap .npy"),
+    )
 
     TDR.add_argparse_args(parser)
     F.add_argparse_eval_args(parser)
@@ -120,6 +227,7 @@ if __name__ == "__main__":
         choices=["book", "vavg", "vavg-lnorm", "savg"],
     )
 
+    parser.add_argument("--use-gpu", default=False, action="store_true")
     parser.add_argument("--score-file", required=True)
     parser.add_argument(
         "-v", "--verbose", dest="verbose", default=1, choices=[0, 1, 2, 3], type=int
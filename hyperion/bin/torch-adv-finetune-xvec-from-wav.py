@@ -27,6 +27,7 @@ from hyperion.torch.utils import ddp
 from hyperion.torch.models import XVector as XVec
 from hyperion.torch.trainers import XVectorAdvTrainerFromWav as Trainer
 from hyperion.torch.data import AudioDataset as AD
+from hyperion.torch.data import AudioShardDataset as ASD
 from hyperion.torch.data import ClassWeightedSeqSampler as Sampler
 from hyperion.torch.metrics import CategoricalAccuracy
 from hyperion.torch.narchs import AudioFeatsMVN as AF
@@ -40,6 +41,7 @@ def init_data(
     val_list,
     train_aug_cfg,
     val_aug_cfg,
+    train_shards,
     num_workers,
     num_gpus,
     rank,
@@ -53,22 +55,43 @@ def init_data(
         logging.info("sampler args={}".format(sampler_args))
         logging.info("init datasets")
 
-    train_data = AD(audio_path, train_list, aug_cfg=train_aug_cfg, **ad_args)
-    val_data = AD(audio_path, val_list, aug_cfg=val_aug_cfg, is_val=True, **ad_args)
-
-    if rank == 0:
-        logging.info("init samplers")
-    train_sampler = Sampler(train_data, **sampler_args)
-    val_sampler = Sampler(val_data, **sampler_args)
-
     num_workers_per_gpu = int((num_workers + num_gpus - 1) / num_gpus)
     largs = (
         {"num_workers": num_workers_per_gpu, "pin_memory": True} if num_gpus > 0 else {}
     )
+    if num_gpus > 0 and num_workers_per_gpu > 0:
+        # keep the workers alive between epochs and a few batches queued
+        # in pinned memory, worker startup dominates short epochs
+        largs["persistent_workers"] = True
+        largs["prefetch_factor"] = 4
+
+    if train_shards is not None:
+        # stream the training wavs from tar shards with sequential reads
+        # instead of one small random read per chunk
+        asd_args = ASD.filter_args(**kwargs)
+        if rank == 0:
+            logging.info("audio shard dataset args={}".format(asd_args))
+        train_data = ASD(
+            train_shards,
+            train_list,
+            aug_cfg=train_aug_cfg,
+            batch_size=sampler_args["batch_size"],
+            **asd_args
+        )
+        train_loader = torch.utils.data.DataLoader(
+            train_data, batch_size=sampler_args["batch_size"], **largs
+        )
+    else:
+        train_data = AD(audio_path, train_list, aug_cfg=train_aug_cfg, **ad_args)
+        if rank == 0:
+            logging.info("init samplers")
+        train_sampler = Sampler(train_data, **sampler_args)
+        train_loader = torch.utils.data.DataLoader(
+            train_data, batch_sampler=train_sampler, **largs
+        )
 
-    train_loader = torch.utils.data.DataLoader(
-        train_data, batch_sampler=train_sampler, **largs
-    )
+    val_data = AD(audio_path, val_list, aug_cfg=val_aug_cfg, is_val=True, **ad_args)
+    val_sampler = Sampler(val_data, **sampler_args)
 
     test_loader = torch.utils.data.DataLoader(
         val_data, batch_sampler=val_sampler, **largs
@@ -169,8 +192,18 @@ if __name__ == "__main__":
     parser.add_argument("--audio-path", required=True)
     parser.add_argument("--train-list", dest="train_list", required=True)
     parser.add_argument("--val-list", dest="val_list", required=True)
+    parser.add_argument(
+        "--train-shards",
+        default=None,
+        help=(
+            "tar shards with the training wavs, e.g. "
+            "train-{000000..000123}.tar, if given the training set is "
+            "streamed from the shards instead of read from audio-path"
+        ),
+    )
 
     AD.add_argparse_args(parser)
+    ASD.add_argparse_args(parser)
     Sampler.add_argparse_args(parser)
 
     parser.add_argument("--train-aug-cfg", default=None)
@@ -85,20 +85,38 @@ class QScoringHomoGBE(HypModel):
         else:
             num_classes = self.num_classes
 
-        if class_ids is not None:
-            p_theta = int2onehot(class_ids, num_classes)
-
-        if sample_weight is not None:
-            p_theta = sample_weight[:, None] * p_theta
-
         mu_x = x[:, :x_dim]
         s_x = x[:, x_dim:]
 
         prec_x = 1 / s_x
 
-        N = np.sum(p_theta, axis=0)
-        eta = np.dot(p_theta.T, prec_x * mu_x)
-        prec = 1 + np.dot(p_theta.T, prec_x - 1)
+        if class_ids is not None:
+            # with hard labels we pool with scatter-adds, this avoids
+            # materializing the num_samples x num_classes one-hot matrix
+            # and the gemms against it
+            wu = prec_x * mu_x
+            wv = prec_x - 1
+            if sample_weight is not None:
+                wu = sample_weight[:, None] * wu
+                wv = sample_weight[:, None] * wv
+                N = np.bincount(
+                    class_ids, weights=sample_weight, minlength=num_classes
+                )
+            else:
+                N = np.bincount(class_ids, minlength=num_classes)
+
+            N = N.astype(float_cpu(), copy=False)
+            eta = np.zeros((num_classes, x_dim), dtype=float_cpu())
+            np.add.at(eta, class_ids, wu)
+            prec = np.ones((num_classes, x_dim), dtype=float_cpu())
+            np.add.at(prec, class_ids, wv)
+        else:
+            if sample_weight is not None:
+                p_theta = sample_weight[:, None] * p_theta
+
+            N = np.sum(p_theta, axis=0)
+            eta = np.dot(p_theta.T, prec_x * mu_x)
+            prec = 1 + np.dot(p_theta.T, prec_x - 1)
         if self.prior is not None:
             eta += self.prior.W * self.prior.mu
             prec += self.prior.W - 1
@@ -60,7 +60,7 @@ class TrialDataReader(object):
         self.enroll = enroll
         self.ndx = ndx
 
-    def read(self):
+    def read(self, return_enroll_ids=False):
 
         x_e = self.r.read(self.enroll.key, squeeze=True)
         x_t = self.r.read(self.ndx.seg_set, squeeze=True)
@@ -69,8 +69,25 @@ class TrialDataReader(object):
             x_e = self.preproc.predict(x_e)
             x_t = self.preproc.predict(x_t)
 
+        if return_enroll_ids:
+            enroll, ids_e = self._unique_enroll_ids(self.enroll.info)
+            return x_e, x_t, enroll, ids_e, self.ndx
+
         return x_e, x_t, self.enroll.info, self.ndx
 
+    @staticmethod
+    def _unique_enroll_ids(enroll):
+        # enroll lists usually come sorted from the upstream manifests,
+        # then the unique models and the inverse index can be obtained
+        # with a linear pass instead of np.unique's O(E log E) string sort
+        if np.all(enroll[:-1] <= enroll[1:]):
+            is_first = np.ones(len(enroll), dtype=bool)
+            is_first[1:] = enroll[1:] != enroll[:-1]
+            ids_e = np.cumsum(is_first) - 1
+            return enroll[is_first], ids_e
+
+        return np.unique(enroll, return_inverse=True)
+
     @staticmethod
     def filter_args(**kwargs):
         valid_args = (
@@ -106,9 +106,17 @@ class HypModel(object):
         for k in params:
             p_name = prefix + k
             if p_name in f:
-                param_dict[k] = np.asarray(f[p_name]).astype(
-                    dtype=dtypes[k], copy=False
-                )
+                # let hdf5 convert the dtype while reading, this fills a
+                # single buffer at the target dtype instead of loading at
+                # the stored dtype and casting a second copy; in h5py<3
+                # astype returns a context manager instead of a sliceable
+                # view, read and cast in two steps there
+                try:
+                    param_dict[k] = f[p_name].astype(dtypes[k])[...]
+                except TypeError:
+                    param_dict[k] = np.asarray(f[p_name]).astype(
+                        dtype=dtypes[k], copy=False
+                    )
             else:
                 param_dict[k] = None
         return param_dict
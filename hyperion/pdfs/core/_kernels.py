@@ -0,0 +1,55 @@
+"""
+ Copyright 2018 Johns Hopkins University  (Author: Jesus Villalba)
+ Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+
+# tile width for the accumulator, 4096 float64 stay within a 256 KB L2
+# together with a few stats rows
+_D_TILE = 4096
+
+
+if _HAVE_NUMBA:
+
+    @njit(fastmath=True, cache=True, nogil=True)
+    def _accum_weighted_stats_numba(u_x, w, out):
+        N = 0.0
+        num_rows, num_cols = u_x.shape
+        # for wide stats the accumulator is swept in column tiles so the
+        # active slice of out stays cache resident over all the rows;
+        # the first tile also accumulates the weight count
+        for j0 in range(0, num_cols, _D_TILE):
+            j1 = min(j0 + _D_TILE, num_cols)
+            for i in range(num_rows):
+                w_i = w[i]
+                if j0 == 0:
+                    N += w_i
+                for j in range(j0, j1):
+                    out[j] += w_i * u_x[i, j]
+        return N
+
+
+def accum_weighted_stats(u_x, w):
+    """Accumulates the weight count N = sum_i w_i and the weighted
+    sufficient stats sum_i w_i u_x[i] in a single fused sweep over w and
+    u_x, without building a weighted copy; the inner stats loop is
+    vectorized by LLVM.
+
+    Falls back to a weight sum plus a BLAS gemv when numba is not
+    available. Returns (N, acc_u_x).
+    """
+    if _HAVE_NUMBA and u_x.ndim == 2:
+        acc = np.zeros(u_x.shape[1], dtype=u_x.dtype)
+        N = _accum_weighted_stats_numba(u_x, w, acc)
+        return N, acc
+
+    return np.sum(w), np.dot(w, u_x)
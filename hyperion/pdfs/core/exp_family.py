@@ -3,19 +3,43 @@
  Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
-from abc import ABCMeta, abstractmethod
+from abc import abstractmethod
 from .pdf import PDF
+from ._kernels import accum_weighted_stats
 
 
 class ExpFamily(PDF):
-    __metaclass__ = ABCMeta
-
     def __init__(self, eta=None, **kwargs):
         super(ExpFamily, self).__init__(**kwargs)
         self.eta = eta
         self.A = None
+        # known at construction time, lets the accumulators skip the
+        # dispatch to compute_suff_stats when it is the base identity
+        self.compute_suff_stats_is_identity = (
+            type(self).compute_suff_stats == ExpFamily.compute_suff_stats
+        )
+        # with the base-class zero measure the log_h term of the ELBO is
+        # identically 0, so elbo can skip accumulating it
+        self.log_h_is_zero = type(self).log_h == ExpFamily.log_h
+
+    @property
+    def eta(self):
+        return self._eta
+
+    @eta.setter
+    def eta(self, eta):
+        # keep eta contiguous so the llk/elbo inner products dispatch to
+        # the BLAS fast path; assigning new natural params invalidates
+        # the cached init state so the log-partition A is rederived
+        # lazily instead of staying stale, and elbo can keep using the
+        # cached scalar A between eta updates
+        self._eta = None if eta is None else np.ascontiguousarray(eta)
+        self._is_init = False
 
     @property
     def is_init(self):
@@ -27,17 +51,28 @@ class ExpFamily(PDF):
         return self._is_init
 
     def fit(
-        self, x, sample_weight=None, x_val=None, sample_weight_val=None, batch_size=None
+        self,
+        x,
+        sample_weight=None,
+        x_val=None,
+        sample_weight_val=None,
+        batch_size=None,
+        dtype=None,
     ):
 
-        N, u_x = self.Estep(x=x, sample_weight=sample_weight, batch_size=batch_size)
+        N, u_x = self.Estep(
+            x=x, sample_weight=sample_weight, batch_size=batch_size, dtype=dtype
+        )
         self.Mstep(N, u_x)
         elbo = self.elbo(x, N=N, u_x=u_x)
         elbo = [elbo, elbo / N]
 
         if x_val is not None:
             N, u_x = self.Estep(
-                x=x_val, sample_weight=sample_weight_val, batch_size=batch_size
+                x=x_val,
+                sample_weight=sample_weight_val,
+                batch_size=batch_size,
+                dtype=dtype,
             )
             elbo_val = self.elbo(x_val, N=N, u_x=u_x)
             elbo += [elbo_val, elbo_val / N]
@@ -47,44 +82,85 @@ class ExpFamily(PDF):
         return 0
 
     def accum_log_h(self, x, sample_weight=None):
+        log_h = self.log_h(x)
+        if np.isscalar(log_h):
+            # constant base measure, e.g. the 0 of this base class
+            if sample_weight is None:
+                return log_h * x.shape[0]
+            return log_h * np.sum(sample_weight)
+
         if sample_weight is None:
-            return np.sum(self.log_h(x))
-        return np.sum(sample_weight * self.log_h(x))
+            return np.sum(log_h)
+        # the dot fuses the weighting and the reduction in one pass
+        return np.dot(sample_weight, log_h)
 
     def compute_suff_stats(self, x):
         return x
 
     def accum_suff_stats(self, x, u_x=None, sample_weight=None, batch_size=None):
-        if u_x is not None or batch_size is None:
+        if u_x is not None or batch_size is None or batch_size >= x.shape[0]:
+            # x fits in one batch, a single contiguous reduction beats
+            # the per-chunk dispatch and partial sums
             return self._accum_suff_stats_1batch(x, u_x, sample_weight)
         else:
             return self._accum_suff_stats_nbatches(x, sample_weight, batch_size)
 
     def _accum_suff_stats_1batch(self, x, u_x=None, sample_weight=None):
         if u_x is None:
-            u_x = self.compute_suff_stats(x)
+            if self.compute_suff_stats_is_identity:
+                u_x = x
+            else:
+                u_x = self.compute_suff_stats(x)
         if sample_weight is None:
             N = u_x.shape[0]
+            acc_u_x = np.sum(u_x, axis=0)
         else:
-            u_x *= sample_weight[:, None]
-            N = np.sum(sample_weight)
-        acc_u_x = np.sum(u_x, axis=0)
+            # single-pass weighted reduction, the weight count comes out
+            # of the same sweep and no weighted copy of u_x is
+            # materialized; a caller-provided u_x is left untouched
+            N, acc_u_x = accum_weighted_stats(u_x, sample_weight)
         return N, acc_u_x
 
     def _accum_suff_stats_nbatches(self, x, sample_weight, batch_size):
-        sw_i = None
-        for i1 in range(0, x.shape[0], batch_size):
-            i2 = np.minimum(i1 + batch_size, x.shape[0])
-            x_i = x[i1:i2, :]
-            if sample_weight is not None:
-                sw_i = sample_weight[i1:i2]
+        # array_split sets up all the views at once, the loop body does
+        # no index math per batch and the batches come out balanced
+        n_splits = (x.shape[0] + batch_size - 1) // batch_size
+        x_chunks = np.array_split(x, n_splits)
+        if sample_weight is None:
+            sw_chunks = [None] * n_splits
+        else:
+            sw_chunks = np.array_split(sample_weight, n_splits)
+
+        # the batches are independent and the reductions run in BLAS or
+        # the nogil numba kernel, so they scale across a thread pool;
+        # half the cores because BLAS threads its own calls, and at most
+        # a few in flight because each batch holds its expanded suff
+        # stats alive, which is the memory batch_size exists to bound
+        num_workers = min(n_splits, 4, max(1, (os.cpu_count() or 2) // 2))
+        if num_workers > 1:
+            with ThreadPoolExecutor(max_workers=num_workers) as pool:
+                results = list(
+                    pool.map(
+                        lambda x_i, sw_i: self._accum_suff_stats_1batch(
+                            x_i, sample_weight=sw_i
+                        ),
+                        x_chunks,
+                        sw_chunks,
+                    )
+                )
+            N = sum(r[0] for r in results)
+            u_x = np.add.reduce([r[1] for r in results])
+            return N, u_x
+
+        # the first batch provides the accumulator buffer, the loop then
+        # adds into it in place without any per-iteration branching
+        N, u_x = self._accum_suff_stats_1batch(
+            x_chunks[0], sample_weight=sw_chunks[0]
+        )
+        for x_i, sw_i in zip(x_chunks[1:], sw_chunks[1:]):
             N_i, u_x_i = self._accum_suff_stats_1batch(x_i, sample_weight=sw_i)
-            if i1 == 0:
-                N = N_i
-                u_x = u_x_i
-            else:
-                N += N_i
-                u_x += u_x_i
+            N += N_i
+            np.add(u_x, u_x_i, out=u_x)
         return N, u_x
 
     def add_suff_stats(self, N, u_x):
@@ -96,8 +172,21 @@ class ExpFamily(PDF):
             acc_u_x += u[i]
         return acc_N, acc_u_x
 
-    def Estep(self, x, u_x=None, sample_weight=None, batch_size=None):
-        return self.accum_suff_stats(x, u_x, sample_weight, batch_size)
+    def Estep(self, x, u_x=None, sample_weight=None, batch_size=None, dtype=None):
+        if dtype is None:
+            return self.accum_suff_stats(x, u_x, sample_weight, batch_size)
+
+        # accumulate in reduced precision for bandwidth, e.g. float32;
+        # only the unweighted np.sum path reduces pairwise, the weighted
+        # reduction (numba kernel or gemv) is sequential and its rounding
+        # error grows with the number of samples, so keep the default
+        # float64 for very large N or badly scaled stats; the accumulator
+        # is upcast so eta/A and the ELBO remain float64
+        x = x.astype(dtype, copy=False)
+        if sample_weight is not None:
+            sample_weight = sample_weight.astype(dtype, copy=False)
+        N, u_x = self.accum_suff_stats(x, u_x, sample_weight, batch_size)
+        return float(N), u_x.astype("float64", copy=False)
 
     @abstractmethod
     def Mstep(self, stats):
@@ -105,13 +194,18 @@ class ExpFamily(PDF):
 
     def elbo(self, x, u_x=None, N=1, log_h=None, sample_weight=None, batch_size=None):
         assert self.is_init
+        if u_x is not None and log_h is None and self.log_h_is_zero:
+            # fast path for the EM loop, where the Estep stats are passed
+            # in and the base measure is 0: the ELBO reduces to a single
+            # inner product
+            return np.dot(u_x, self.eta) - N * self.A
         if u_x is None:
             N, u_x = self.accum_suff_stats(
                 x, sample_weight=sample_weight, batch_size=batch_size
             )
         if log_h is None:
             log_h = self.accum_log_h(x, sample_weight=sample_weight)
-        return log_h + np.inner(u_x, self.eta) - N * self.A
+        return log_h + np.dot(u_x, self.eta) - N * self.A
 
     def log_prob(self, x, u_x=None, method="nat"):
         if method == "nat":
@@ -120,10 +214,13 @@ class ExpFamily(PDF):
             return self.log_prob_std(x)
 
     def log_prob_nat(self, x, u_x=None):
+        # u_x is (num_samples, dim), the whole batch is scored with one
+        # gemv; np.add broadcasts log_h whether it is the scalar of the
+        # base class or a per-sample vector
         assert self.is_init
         if u_x is None:
             u_x = self.compute_suff_stats(x)
-        return self.log_h(x) + np.inner(u_x, self.eta) - self.A
+        return np.add(self.log_h(x), np.dot(u_x, self.eta)) - self.A
 
     @staticmethod
     def compute_A_nat(eta):
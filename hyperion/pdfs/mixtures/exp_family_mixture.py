@@ -197,7 +197,7 @@ class ExpFamilyMixture(PDF):
     def _accum_suff_stats_nbatches(self, x, sample_weight, batch_size):
         sw_i = None
         for i1 in range(0, x.shape[0], batch_size):
-            i2 = np.minimum(i1 + batch_size, x.shape[0])
+            i2 = min(i1 + batch_size, x.shape[0])
             x_i = x[i1:i2, :]
             if sample_weight is not None:
                 sw_i = sample_weight[i1:i2]
@@ -274,7 +274,7 @@ class ExpFamilyMixture(PDF):
 
         sw_i = None
         for i1 in range(0, x.shape[0], batch_size):
-            i2 = np.minimum(i1 + batch_size, x.shape[0])
+            i2 = min(i1 + batch_size, x.shape[0])
             x_i = x[i1:i2, :]
             prob_i = prob[i1:i2, :]
             if sample_weight is not None:
@@ -364,7 +364,7 @@ class ExpFamilyMixture(PDF):
         sw_i = None
         cur_segment = 0
         for i1 in range(0, x.shape[0], batch_shift):
-            i2 = np.minimum(i1 + batch_size, x.shape[0])
+            i2 = min(i1 + batch_size, x.shape[0])
             x_i = x[i1:i2, :]
             if sample_weight is not None:
                 sw_i = sample_weight[i1:i2]
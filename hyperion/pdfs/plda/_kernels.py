@@ -0,0 +1,36 @@
+"""
+ Copyright 2018 Johns Hopkins University  (Author: Jesus Villalba)
+ Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+"""
+
+try:
+    from numba import njit, prange
+
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+
+if _HAVE_NUMBA:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _finalize_llr_1vs1_numba(scores, Q1, Q2, const):
+        for i in prange(scores.shape[0]):
+            for j in range(scores.shape[1]):
+                scores[i, j] += 0.5 * (Q1[i] + Q2[j] + const)
+
+
+def finalize_llr_1vs1(scores, Q1, Q2, const):
+    """Adds the per-side quadratic terms and the log-det constant to the
+    pairwise LLR scores in a single pass over the score matrix, so the
+    gemm output is not traversed again for each bias term.
+
+    scores must contain the cross term gamma_1 gamma_2^T and is updated
+    in place.
+    """
+    if _HAVE_NUMBA:
+        _finalize_llr_1vs1_numba(scores, Q1, Q2, float(const))
+        return scores
+
+    scores += 0.5 * (Q1[:, None] + Q2 + const)
+    return scores
@@ -255,7 +255,7 @@ class FRPLDA(PLDABase):
         kwargs = dict(list(config.items()) + list(params.items()))
         return cls(**kwargs)
 
-    def llr_1vs1(self, x1, x2):
+    def _llr_1vs1_aux(self):
 
         assert self.is_init
 
@@ -275,32 +275,31 @@ class FRPLDA(PLDABase):
         )[:2]
         logLtar = 2 * logcholLtar
 
-        WF1 = np.dot(x1, self.W)
-        WF2 = np.dot(x2, self.W)
-        Bmu = np.dot(self.mu, self.B)
-
-        gamma_non_1 = mult_icholLnon(WF1 + Bmu)
-        gamma_non_2 = mult_icholLnon(WF2 + Bmu)
-
-        Qnon_1 = np.sum(gamma_non_1 * gamma_non_1, axis=1)[:, None]
-        Qnon_2 = np.sum(gamma_non_2 * gamma_non_2, axis=1)
-
-        gamma_tar_1 = mult_icholLtar(WF1 + 0.5 * Bmu)
-        gamma_tar_2 = mult_icholLtar(WF2 + 0.5 * Bmu)
-
-        Qtar_1 = np.sum(gamma_tar_1 * gamma_tar_1, axis=1)[:, None]
-        Qtar_2 = np.sum(gamma_tar_2 * gamma_tar_2, axis=1)
-
-        scores = 2 * np.dot(gamma_tar_1, gamma_tar_2.T)
-        scores += Qtar_1 - Qnon_1 + Qtar_2 - Qnon_2
-        scores += (
+        const = (
             2 * logLnon
             - logLtar
             - logdet_pdmat(self.B)
             + np.inner(np.dot(self.mu, self.B), self.mu)
         )
-        scores *= 0.5
-        return scores
+        return mult_icholLnon, mult_icholLtar, const
+
+    def compute_llr_1vs1_stats(self, x):
+
+        mult_icholLnon, mult_icholLtar, _ = self._llr_1vs1_aux()
+
+        WF = np.dot(x, self.W)
+        Bmu = np.dot(self.mu, self.B)
+
+        gamma_non = mult_icholLnon(WF + Bmu)
+        Qnon = np.sum(gamma_non * gamma_non, axis=1)
+
+        gamma_tar = mult_icholLtar(WF + 0.5 * Bmu)
+        Qtar = np.sum(gamma_tar * gamma_tar, axis=1)
+
+        return gamma_tar, Qtar - Qnon
+
+    def _llr_1vs1_const(self):
+        return self._llr_1vs1_aux()[2]
 
     def llr_NvsM_book(self, D1, D2):
 
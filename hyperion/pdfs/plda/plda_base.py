@@ -10,6 +10,7 @@ from abc import ABCMeta, abstractmethod
 from ...hyp_defs import float_cpu
 from ..core.pdf import PDF
 from ...transforms import LNorm
+from ._kernels import finalize_llr_1vs1
 
 
 class PLDABase(PDF):
@@ -99,10 +100,26 @@ class PLDABase(PDF):
     def MstepMD(self, x):
         pass
 
-    @abstractmethod
     def llr_1vs1(self, x1, x2):
+        return self.llr_1vs1_from_stats(
+            self.compute_llr_1vs1_stats(x1), self.compute_llr_1vs1_stats(x2)
+        )
+
+    @abstractmethod
+    def compute_llr_1vs1_stats(self, x):
         pass
 
+    @abstractmethod
+    def _llr_1vs1_const(self):
+        pass
+
+    def llr_1vs1_from_stats(self, stats1, stats2):
+        gamma_tar_1, Q1 = stats1
+        gamma_tar_2, Q2 = stats2
+
+        scores = np.dot(gamma_tar_1, gamma_tar_2.T)
+        return finalize_llr_1vs1(scores, Q1, Q2, self._llr_1vs1_const())
+
     @abstractmethod
     def llr_NvsM_book(self, D1, D2):
         pass
@@ -246,41 +263,33 @@ class PLDABase(PDF):
         return N, F, S
 
     @staticmethod
-    def compute_stats_hard(x, class_ids, sample_weight=None, scale_factor=None):
+    def compute_stats_hard(
+        x, class_ids, sample_weight=None, scale_factor=None, return_S=True
+    ):
         x_dim = x.shape[1]
         num_classes = np.max(class_ids) + 1
-        N = np.zeros((num_classes,), dtype=float_cpu())
-        F = np.zeros((num_classes, x_dim), dtype=float_cpu())
         if sample_weight is not None:
             wx = sample_weight[:, None] * x
+            N = np.bincount(class_ids, weights=sample_weight, minlength=num_classes)
         else:
             wx = x
+            N = np.bincount(class_ids, minlength=num_classes)
 
-        for i in range(num_classes):
-            idx = class_ids == i
-            if sample_weight is None:
-                N[i] = np.sum(idx).astype(float_cpu())
-                F[i] = np.sum(x[idx], axis=0)
-            else:
-                N[i] = np.sum(sample_weight[idx])
-                F[i] = np.sum(wx[idx], axis=0)
+        N = N.astype(float_cpu(), copy=False)
+        F = np.zeros((num_classes, x_dim), dtype=float_cpu())
+        np.add.at(F, class_ids, wx)
 
-        S = np.dot(x.T, wx)
+        # the scoring paths only pool first order stats, skipping S
+        # avoids an O(N D^2) gemm that would be thrown away
+        S = np.dot(x.T, wx) if return_S else None
         if scale_factor is not None:
             N *= scale_factor
             F *= scale_factor
-            S *= scale_factor
+            if S is not None:
+                S *= scale_factor
 
         return N, F, S
 
-    @staticmethod
-    def compute_stats_hard_v0(x, class_ids, sample_weight=None, scal_factor=None):
-        x_dim = x.shape[1]
-        num_classes = np.max(class_ids) + 1
-        p_theta = np.zeros((x.shape[0], num_classes), dtype=float_cpu())
-        p_theta[np.arange(x.shape[0]), class_ids] = 1
-        return PLDABase.compute_stats_soft(x, p_theta, sample_weight, scal_factor)
-
     @staticmethod
     def center_stats(D, mu):
         N, F, S = D
@@ -293,8 +302,16 @@ class PLDABase(PDF):
         if method == "savg":
             return self.llr_NvsM_savg(x1, ids1, x2, ids2)
 
-        D1 = x1 if ids1 is None else self.compute_stats_hard(x1, class_ids=ids1)
-        D2 = x2 if ids2 is None else self.compute_stats_hard(x2, class_ids=ids2)
+        D1 = (
+            x1
+            if ids1 is None
+            else self.compute_stats_hard(x1, class_ids=ids1, return_S=False)
+        )
+        D2 = (
+            x2
+            if ids2 is None
+            else self.compute_stats_hard(x2, class_ids=ids2, return_S=False)
+        )
 
         if method == "book":
             return self.llr_NvsM_book(D1, D2)
@@ -315,9 +332,9 @@ class PLDABase(PDF):
 
     def llr_NvsM_savg(self, x1, ids1, x2, ids2):
         scores_1vs1 = self.llr_1vs1(x1, x2)
-        N, F, _ = self.compute_stats_hard(scores_1vs1, ids1)
+        N, F, _ = self.compute_stats_hard(scores_1vs1, ids1, return_S=False)
         scores_Nvs1 = F / N[:, None]
-        N, F, _ = self.compute_stats_hard(scores_Nvs1.T, ids2)
+        N, F, _ = self.compute_stats_hard(scores_Nvs1.T, ids2, return_S=False)
         scores = F.T / N
         return scores
 
@@ -325,10 +342,14 @@ class PLDABase(PDF):
         if method == "savg":
             return self.llr_Nvs1_savg(x1, ids1, x2)
 
-        D1 = x1 if ids1 is None else self.compute_stats_hard(x1, class_ids=ids1)
+        D1 = (
+            x1
+            if ids1 is None
+            else self.compute_stats_hard(x1, class_ids=ids1, return_S=False)
+        )
 
         if method == "book":
-            D2 = self.compute_stats_hard(x2, np.arange(x2.shape[0]))
+            D2 = self.compute_stats_hard(x2, np.arange(x2.shape[0]), return_S=False)
             return self.llr_NvsM_book(D1, D2)
         if method == "vavg":
             return self.llr_Nvs1_vavg(D1, x2, do_lnorm=False)
@@ -346,7 +367,7 @@ class PLDABase(PDF):
 
     def llr_Nvs1_savg(self, x1, ids1, x2):
         scores_1vs1 = self.llr_1vs1(x1, x2)
-        N, F, _ = self.compute_stats_hard(scores_1vs1, ids1)
+        N, F, _ = self.compute_stats_hard(scores_1vs1, ids1, return_S=False)
         scores = F / N[:, None]
         return scores
 
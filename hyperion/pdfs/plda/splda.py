@@ -272,11 +272,11 @@ class SPLDA(PLDABase):
         logp /= 2
         return logp
 
-    def llr_1vs1(self, x1, x2):
+    def _llr_1vs1_aux(self):
 
         WV = np.dot(self.W, self.V.T)
-        VV = np.dot(self.V, WV)
         I = np.eye(self.y_dim, dtype=float_cpu())
+        VV = np.dot(self.V, WV)
 
         Lnon = I + VV
         mult_icholLnon, logcholLnon = invert_trimat(
@@ -294,26 +294,24 @@ class SPLDA(PLDABase):
         )[:2]
         logLtar = 2 * logcholLtar
 
-        VWF1 = np.dot(x1 - self.mu, WV)
-        VWF2 = np.dot(x2 - self.mu, WV)
+        return WV, mult_icholLnon, mult_icholLtar, 2 * logLnon - logLtar
 
-        gamma_non_1 = mult_icholLnon(VWF1)
-        gamma_non_2 = mult_icholLnon(VWF2)
+    def compute_llr_1vs1_stats(self, x):
 
-        Qnon_1 = np.sum(gamma_non_1 * gamma_non_1, axis=1)[:, None]
-        Qnon_2 = np.sum(gamma_non_2 * gamma_non_2, axis=1)
+        WV, mult_icholLnon, mult_icholLtar, _ = self._llr_1vs1_aux()
 
-        gamma_tar_1 = mult_icholLtar(VWF1)
-        gamma_tar_2 = mult_icholLtar(VWF2)
+        VWF = np.dot(x - self.mu, WV)
 
-        Qtar_1 = np.sum(gamma_tar_1 * gamma_tar_1, axis=1)[:, None]
-        Qtar_2 = np.sum(gamma_tar_2 * gamma_tar_2, axis=1)
+        gamma_non = mult_icholLnon(VWF)
+        Qnon = np.sum(gamma_non * gamma_non, axis=1)
 
-        scores = 2 * np.dot(gamma_tar_1, gamma_tar_2.T)
-        scores += Qtar_1 - Qnon_1 + Qtar_2 - Qnon_2
-        scores += 2 * logLnon - logLtar
-        scores *= 0.5
-        return scores
+        gamma_tar = mult_icholLtar(VWF)
+        Qtar = np.sum(gamma_tar * gamma_tar, axis=1)
+
+        return gamma_tar, Qtar - Qnon
+
+    def _llr_1vs1_const(self):
+        return self._llr_1vs1_aux()[3]
 
     def llr_NvsM_book(self, D1, D2):
         N1, F1, _ = D1
@@ -18,6 +18,30 @@ class AdaptSNorm(ScoreNorm):
         self.nbest = nbest
         self.nbest_discard = nbest_discard
 
+    def _best_coh_idx(self, scores, nbest, axis=0):
+        # top-k selection with argpartition, O(N) vs O(N log N) of a full
+        # sort over the cohort axis; the mean/std of the selected cohort
+        # scores do not depend on the order inside the top-k set, so we
+        # only sort the k selected entries when we need to discard the
+        # nbest_discard highest ones
+        k = self.nbest_discard + nbest
+        best_idx = np.argpartition(scores, -k, axis=axis)
+        if axis == 0:
+            best_idx = best_idx[-k:]
+        else:
+            best_idx = best_idx[:, -k:]
+
+        if self.nbest_discard > 0:
+            vals = np.take_along_axis(scores, best_idx, axis=axis)
+            order = np.argsort(-vals, axis=axis)
+            best_idx = np.take_along_axis(best_idx, order, axis=axis)
+            if axis == 0:
+                best_idx = best_idx[self.nbest_discard :]
+            else:
+                best_idx = best_idx[:, self.nbest_discard :]
+
+        return best_idx
+
     def predict(
         self,
         scores,
@@ -39,50 +63,127 @@ class AdaptSNorm(ScoreNorm):
         if mask_enr_coh is not None:
             scores_enr_coh[mask_enr_coh == False] = 0
 
-        best_idx = np.flipud(np.argsort(scores_coh_test, axis=0))[
-            self.nbest_discard : self.nbest_discard + nbest
-        ]
-        scores_z_norm = np.zeros_like(scores)
+        best_idx = self._best_coh_idx(scores_coh_test, nbest, axis=0)
+        mu_z = np.zeros_like(scores)
+        s_z = np.zeros_like(scores)
         for i in range(scores.shape[1]):
             best_idx_i = best_idx[:, i]
 
-            mu_z = np.mean(scores_enr_coh[:, best_idx_i], axis=1, keepdims=True)
+            mu_z[:, i] = np.mean(scores_enr_coh[:, best_idx_i], axis=1)
 
             if mask_enr_coh is None:
-                s_z = np.std(scores_enr_coh[:, best_idx_i], axis=1, keepdims=True)
+                s_z[:, i] = np.std(scores_enr_coh[:, best_idx_i], axis=1)
             else:
-                norm = np.mean(mask_enr_coh[:, best_idx_i], axis=1, keepdims=True)
-                mu_z /= norm
-                s_z = np.sqrt(
-                    np.mean(scores_enr_coh[:, best_idx_i] ** 2, axis=1, keepdims=True)
-                    / norm
-                    - mu_z ** 2
+                norm = np.mean(mask_enr_coh[:, best_idx_i], axis=1)
+                mu_z[:, i] /= norm
+                s_z[:, i] = np.sqrt(
+                    np.mean(scores_enr_coh[:, best_idx_i] ** 2, axis=1) / norm
+                    - mu_z[:, i] ** 2
                 )
 
-            s_z = np.clip(s_z, a_min=1e-5, a_max=None)
-            scores_z_norm[:, i] = (scores[:, i] - mu_z.T) / s_z.T
+        np.clip(s_z, a_min=1e-5, a_max=None, out=s_z)
 
-        best_idx = np.fliplr(np.argsort(scores_enr_coh, axis=1))[
-            :, self.nbest_discard : self.nbest_discard + nbest
-        ]
-        scores_t_norm = np.zeros_like(scores)
+        best_idx = self._best_coh_idx(scores_enr_coh, nbest, axis=1)
+        mu_t = np.zeros_like(scores)
+        s_t = np.zeros_like(scores)
         for i in range(scores.shape[0]):
             best_idx_i = best_idx[i]
 
-            mu_z = np.mean(scores_coh_test[best_idx_i, :], axis=0, keepdims=True)
+            mu_t[i, :] = np.mean(scores_coh_test[best_idx_i, :], axis=0)
 
             if mask_coh_test is None:
-                s_z = np.std(scores_coh_test[best_idx_i, :], axis=0, keepdims=True)
+                s_t[i, :] = np.std(scores_coh_test[best_idx_i, :], axis=0)
             else:
-                norm = np.mean(mask_coh_test[best_idx_i, :], axis=0, keepdims=True)
-                mu_z /= norm
-                s_z = np.sqrt(
-                    np.mean(scores_coh_test[best_idx_i, :] ** 2, axis=0, keepdims=True)
-                    / norm
-                    - mu_z ** 2
+                norm = np.mean(mask_coh_test[best_idx_i, :], axis=0)
+                mu_t[i, :] /= norm
+                s_t[i, :] = np.sqrt(
+                    np.mean(scores_coh_test[best_idx_i, :] ** 2, axis=0) / norm
+                    - mu_t[i, :] ** 2
                 )
 
-            s_z = np.clip(s_z, a_min=1e-5, a_max=None)
-            scores_t_norm[i, :] = (scores[i, :] - mu_z) / s_z
+        np.clip(s_t, a_min=1e-5, a_max=None, out=s_t)
+
+        return self.predict_from_stats(scores, mu_z, s_z, mu_t, s_t)
+
+    def predict_from_stats(self, scores, mu_z, s_z, mu_t, s_t):
+        # one broadcasted pass over contiguous arrays, reusing the stats
+        # buffers so no extra (num_enroll x num_test) temporary is allocated
+        scores_z_norm = np.subtract(scores, mu_z, out=mu_z)
+        scores_z_norm /= s_z
+        scores_t_norm = np.subtract(scores, mu_t, out=mu_t)
+        scores_t_norm /= s_t
+        scores_z_norm += scores_t_norm
+        scores_z_norm /= np.sqrt(2)
+        return scores_z_norm
+
+    def predict_from_chunks(self, scores, scores_coh_test_chunks, scores_enr_coh):
+        """Applies adaptive S-Norm streaming over the cohort axis.
+
+        scores_coh_test_chunks is an iterable yielding consecutive chunks
+        of rows of the cohort vs. test score matrix, so the full
+        (num_coh x num_test) matrix is never materialized.
+        """
+        num_coh = scores_enr_coh.shape[1]
+        assert self.nbest_discard < num_coh
+        if self.nbest > num_coh - self.nbest_discard:
+            nbest = num_coh - self.nbest_discard
+        else:
+            nbest = self.nbest
+
+        k = self.nbest_discard + nbest
+
+        # selection matrix of the nbest cohort scores per enrollment model
+        best_idx_enr = self._best_coh_idx(scores_enr_coh, nbest, axis=1)
+        sel_enr = np.zeros(scores_enr_coh.shape, dtype=scores.dtype)
+        np.put_along_axis(sel_enr, best_idx_enr, 1, axis=1)
+
+        # t-norm stats are accumulated chunk by chunk, the z-norm
+        # selection keeps a running top-k per test segment
+        mu_t = np.zeros_like(scores)
+        s_t = np.zeros_like(scores)
+        top_vals = np.full((k, scores.shape[1]), -np.inf, dtype=scores.dtype)
+        top_idx = np.zeros((k, scores.shape[1]), dtype=np.int64)
+
+        first = 0
+        for scores_i in scores_coh_test_chunks:
+            chunk_size = scores_i.shape[0]
+            sel_i = sel_enr[:, first : first + chunk_size]
+            mu_t += np.dot(sel_i, scores_i)
+            s_t += np.dot(sel_i, scores_i ** 2)
+
+            cand_vals = np.concatenate((top_vals, scores_i), axis=0)
+            cand_idx = np.concatenate(
+                (
+                    top_idx,
+                    np.broadcast_to(
+                        np.arange(first, first + chunk_size)[:, None],
+                        scores_i.shape,
+                    ),
+                ),
+                axis=0,
+            )
+            sel_top = np.argpartition(cand_vals, -k, axis=0)[-k:]
+            top_vals = np.take_along_axis(cand_vals, sel_top, axis=0)
+            top_idx = np.take_along_axis(cand_idx, sel_top, axis=0)
+            first += chunk_size
+
+        assert first == num_coh
+
+        mu_t /= nbest
+        s_t = np.sqrt(s_t / nbest - mu_t ** 2)
+        s_t = np.clip(s_t, a_min=1e-5, a_max=None)
+
+        if self.nbest_discard > 0:
+            order = np.argsort(-top_vals, axis=0)
+            top_idx = np.take_along_axis(top_idx, order, axis=0)[self.nbest_discard :]
+
+        mu_z = np.zeros_like(scores)
+        s_z = np.zeros_like(scores)
+        for i in range(scores.shape[1]):
+            scores_enr_coh_i = scores_enr_coh[:, top_idx[:, i]]
+            mu_z[:, i] = np.mean(scores_enr_coh_i, axis=1)
+            s_z[:, i] = np.std(scores_enr_coh_i, axis=1)
+
+        s_z = np.clip(s_z, a_min=1e-5, a_max=None)
 
-        return (scores_z_norm + scores_t_norm) / np.sqrt(2)
+        return self.predict_from_stats(scores, mu_z, s_z, mu_t, s_t)
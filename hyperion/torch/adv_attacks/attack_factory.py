@@ -4,6 +4,9 @@
 """
 from jsonargparse import ArgumentParser, ActionParser
 
+import torch
+import torch.nn as nn
+
 from .fgsm_attack import FGSMAttack
 from .snr_fgsm_attack import SNRFGSMAttack
 from .rand_fgsm_attack import RandFGSMAttack
@@ -14,6 +17,33 @@ from .carlini_wagner_linf import CarliniWagnerLInf
 from .pgd_attack import PGDAttack
 
 
+class _AMPVictimModel(nn.Module):
+    """Runs the victim model forward under bfloat16 autocast.
+
+    The attacks call forward+backward many times per batch, autocast
+    halves the cost of the matmuls on tensor cores. The output is cast
+    back so the attack loss and the gradients w.r.t. the input stay in
+    fp32.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        # autocast with a dtype argument exists from torch 1.10, the
+        # requirements allow 1.9, so fail at construction instead of
+        # deep inside the attack loop
+        if not hasattr(torch, "autocast"):
+            raise RuntimeError(
+                "mixed-precision attacks require torch>=1.10, found %s"
+                % torch.__version__
+            )
+        self.model = model
+
+    def forward(self, *args, **kwargs):
+        with torch.autocast("cuda", dtype=torch.bfloat16):
+            y = self.model(*args, **kwargs)
+        return y.float()
+
+
 class AttackFactory(object):
     @staticmethod
     def create(
@@ -43,11 +73,15 @@ class AttackFactory(object):
         range_min=None,
         range_max=None,
         eps_scale=1,
+        mixed_precision=False,
     ):
 
         eps = eps * eps_scale
         alpha = alpha * eps_scale
 
+        if mixed_precision:
+            model = _AMPVictimModel(model)
+
         if attack_type == "fgsm":
             return FGSMAttack(
                 model,
@@ -188,6 +222,7 @@ class AttackFactory(object):
             "use_snr",
             "norm_time",
             "targeted",
+            "mixed_precision",
         )
 
         args = dict((k, kwargs[k]) for k in valid_args if k in kwargs)
@@ -358,6 +393,13 @@ class AttackFactory(object):
             help=("normalize norm by number of samples in time dimension"),
         )
 
+        parser.add_argument(
+            "--mixed-precision",
+            default=False,
+            action="store_true",
+            help=("run the victim model forward with bf16 autocast"),
+        )
+
         if prefix is not None:
             outer_parser.add_argument("--" + prefix, action=ActionParser(parser=parser))
             # help='adversarial attack options')
@@ -48,9 +48,8 @@ class IterFGSMAttack(AdvAttack):
             x.requires_grad = True
             output = self.model(x)
             loss = self.loss(output, target)
-            self.model.zero_grad()
-            loss.backward()
-            dL_x = x.grad.data
+            # see PGDAttack, only the input gradient is needed
+            dL_x = torch.autograd.grad(loss, x)[0]
             x = x + f * self.alpha * dL_x.sign()
             x = input + torch.clamp(x - input, -self.eps, self.eps)
 
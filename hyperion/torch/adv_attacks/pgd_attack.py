@@ -150,9 +150,10 @@ class PGDAttack(AdvAttack):
                 x.requires_grad = True
                 output = self.model(x)
                 loss = self.loss(output, target).mean()
-                self.model.zero_grad()
-                loss.backward()
-                dL_x = x.grad.data
+                # only the gradient w.r.t. the input is used, autograd.grad
+                # skips allocating and accumulating the per-parameter grad
+                # buffers of the victim model on every attack iteration
+                dL_x = torch.autograd.grad(loss, x)[0]
                 x = x + f * alpha * dL_x.sign()
                 delta = self._project(x - input, eps, self.norm)
                 x = input + delta
@@ -0,0 +1,273 @@
+"""
+ Copyright 2020 Johns Hopkins University  (Author: Jesus Villalba)
+ Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+"""
+
+import io
+import os
+import re
+import glob
+import random
+import logging
+import tarfile
+from jsonargparse import ArgumentParser, ActionParser
+
+import numpy as np
+import pandas as pd
+import soundfile as sf
+
+import torch
+from torch.utils.data import IterableDataset
+import torch.distributed as dist
+
+from ..torch_defs import floatstr_torch
+from ...utils.utt2info import Utt2Info
+from ...augment import SpeechAugment
+
+
+class AudioShardDataset(IterableDataset):
+    """Streams audio chunks from a set of tar shards.
+
+    Each shard is a tar file containing wav/flac files named by utterance
+    key.  Reading whole shards sequentially replaces the many small random
+    reads of the indexed AudioDataset, which is the bottleneck when training
+    from large lists of short files.  Shards are split between distributed
+    ranks and data-loader workers, and segments are shuffled with a local
+    buffer instead of a full-dataset index.
+
+    When batch_size is given, one chunk length is drawn per batch of
+    yielded samples, like ClassWeightedSeqSampler does, so the default
+    collate can stack variable-length chunk configs; segments shorter
+    than the drawn length are skipped for that batch.
+    """
+
+    def __init__(
+        self,
+        shards,
+        key_file,
+        class_file=None,
+        min_chunk_length=1,
+        max_chunk_length=None,
+        aug_cfg=None,
+        shuffle_buffer_size=1000,
+        batch_size=None,
+        return_class=True,
+        wav_scale=2 ** 15 - 1,
+        is_val=False,
+    ):
+        super().__init__()
+
+        try:
+            rank = dist.get_rank()
+            world_size = dist.get_world_size()
+        except:
+            rank = 0
+            world_size = 1
+
+        self.rank = rank
+        self.world_size = world_size
+
+        self.shards = self._expand_shards(shards)
+        if rank == 0:
+            logging.info("dataset contains %d shards" % len(self.shards))
+
+        if rank == 0:
+            logging.info("loading utt2info file %s" % key_file)
+        self.u2c = Utt2Info.load(key_file, sep=" ")
+
+        self._prepare_class_info(class_file)
+
+        if max_chunk_length is None:
+            max_chunk_length = min_chunk_length
+        self.min_chunk_length = min_chunk_length
+        self.max_chunk_length = max_chunk_length
+
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.batch_size = batch_size
+        self.return_class = return_class
+        self.wav_scale = wav_scale
+        self.is_val = is_val
+        self.epoch = 0
+
+        self.augmenter = None
+        if aug_cfg is not None:
+            self.augmenter = SpeechAugment.create(
+                aug_cfg, random_seed=112358 + 1000 * rank
+            )
+
+    @staticmethod
+    def _expand_shards(shards):
+        """Expands a shard spec into a list of tar files.
+
+        Accepts a list of paths, a brace pattern like
+        train-{000000..000123}.tar, or a glob pattern.
+        """
+        if isinstance(shards, (list, tuple)):
+            return list(shards)
+
+        m = re.search(r"\{(\d+)\.\.(\d+)\}", shards)
+        if m is not None:
+            first, last = m.group(1), m.group(2)
+            fmt = "%0" + str(len(first)) + "d"
+            return [
+                shards[: m.start()] + fmt % i + shards[m.end() :]
+                for i in range(int(first), int(last) + 1)
+            ]
+
+        return sorted(glob.glob(shards))
+
+    def _prepare_class_info(self, class_file):
+        if class_file is None:
+            classes = np.unique(self.u2c.info)
+            class2idx = {k: i for i, k in enumerate(classes)}
+        else:
+            if self.rank == 0:
+                logging.info("reading class-file %s" % (class_file))
+            class_info = pd.read_csv(class_file, header=None, sep=" ")
+            class2idx = {str(k): i for i, k in enumerate(class_info[0])}
+
+        self.num_classes = len(class2idx)
+        self.key2class = {
+            k: class2idx[c] for k, c in zip(self.u2c.key, self.u2c.info)
+        }
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def __len__(self):
+        """Approximate number of samples per epoch on this rank.
+
+        DataLoader and the lr schedulers size the epoch from this; the
+        exact count depends on how many segments pass the chunk-length
+        filter.
+        """
+        return len(self.u2c) // self.world_size
+
+    def _my_shards(self):
+        """Splits the shard list between ranks and data-loader workers."""
+        worker_info = torch.utils.data.get_worker_info()
+        if worker_info is None:
+            worker_id = 0
+            num_workers = 1
+        else:
+            worker_id = worker_info.id
+            num_workers = worker_info.num_workers
+
+        global_id = self.rank * num_workers + worker_id
+        global_workers = self.world_size * num_workers
+        return self.shards[global_id::global_workers], global_id
+
+    def _read_shard(self, shard):
+        """Iterates the (key, signal, fs) tuples of one shard.
+
+        The tar is opened in stream mode so members are decoded from
+        sequential reads without seeking.
+        """
+        with tarfile.open(shard, mode="r|*") as f:
+            for member in f:
+                if not member.isfile():
+                    continue
+                key, ext = os.path.splitext(os.path.basename(member.name))
+                if ext not in (".wav", ".flac"):
+                    continue
+                if key not in self.key2class:
+                    continue
+                data = f.extractfile(member).read()
+                x, fs = sf.read(io.BytesIO(data), dtype="float32")
+                yield key, x * self.wav_scale, fs
+
+    def _make_sample(self, key, x, fs, chunk_length, rng):
+        chunk_samples = int(chunk_length * fs)
+        if len(x) < chunk_samples:
+            return None
+
+        first = rng.randint(0, len(x) - chunk_samples)
+        x = x[first : first + chunk_samples]
+
+        if self.augmenter is not None:
+            x, aug_info = self.augmenter(x)
+
+        x = x.astype(floatstr_torch(), copy=False)
+        if not self.return_class:
+            return (x,)
+
+        return x, self.key2class[key]
+
+    def _iter_segments(self, shards, rng):
+        """Iterates the full (key, signal, fs) segments of the shard
+        stream, shuffled with the local buffer."""
+        buffer = []
+        for shard in shards:
+            for key, x, fs in self._read_shard(shard):
+                if len(x) < self.min_chunk_length * fs:
+                    continue
+                if self.shuffle_buffer_size <= 1 or self.is_val:
+                    yield key, x, fs
+                    continue
+
+                buffer.append((key, x, fs))
+                if len(buffer) >= self.shuffle_buffer_size:
+                    idx = rng.randrange(len(buffer))
+                    buffer[idx], buffer[-1] = buffer[-1], buffer[idx]
+                    yield buffer.pop()
+
+        rng.shuffle(buffer)
+        for segment in buffer:
+            yield segment
+
+    def __iter__(self):
+        shards, global_id = self._my_shards()
+        rng = random.Random(112358 + 1000 * global_id + self.epoch)
+        if not self.is_val:
+            shards = list(shards)
+            rng.shuffle(shards)
+
+        # segments are buffered uncut and the chunk length is drawn per
+        # batch of yields, so all the chunks collated together stack
+        chunk_length = rng.uniform(self.min_chunk_length, self.max_chunk_length)
+        num_in_batch = 0
+        for key, x, fs in self._iter_segments(shards, rng):
+            sample = self._make_sample(key, x, fs, chunk_length, rng)
+            if sample is None:
+                continue
+            yield sample
+            num_in_batch += 1
+            if self.batch_size is not None and num_in_batch == self.batch_size:
+                chunk_length = rng.uniform(
+                    self.min_chunk_length, self.max_chunk_length
+                )
+                num_in_batch = 0
+
+        # persistent data-loader workers keep this object alive between
+        # epochs and never see set_epoch from the main process, so the
+        # epoch advances here after a full pass
+        self.epoch += 1
+
+    @staticmethod
+    def filter_args(**kwargs):
+        valid_args = (
+            "class_file",
+            "min_chunk_length",
+            "max_chunk_length",
+            "wav_scale",
+            "shuffle_buffer_size",
+        )
+        return dict((k, kwargs[k]) for k in valid_args if k in kwargs)
+
+    @staticmethod
+    def add_class_args(parser, prefix=None):
+        if prefix is not None:
+            outer_parser = parser
+            parser = ArgumentParser(prog="")
+
+        parser.add_argument(
+            "--shuffle-buffer-size",
+            type=int,
+            default=1000,
+            help=("local buffer size used to shuffle the shard stream"),
+        )
+
+        if prefix is not None:
+            outer_parser.add_argument("--" + prefix, action=ActionParser(parser=parser))
+
+    add_argparse_args = add_class_args
@@ -220,6 +220,10 @@ class TorchTrainer(object):
         val_logs = {}
         self.loggers.on_train_begin(epochs=self.epochs)
         for epoch in range(self.cur_epoch, self.epochs):
+            if hasattr(train_data.dataset, "set_epoch"):
+                # iterable datasets reseed their shuffling from the
+                # epoch counter
+                train_data.dataset.set_epoch(epoch)
 
             self.loggers.on_epoch_begin(epoch, batches=len(train_data))
             if self.lr_scheduler is not None:
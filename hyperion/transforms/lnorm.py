@@ -12,6 +12,18 @@ class LNorm(CentWhiten):
     """Class to do length normalization."""
 
     def predict(self, x):
-        x = super().predict(x)
-        mx = np.sqrt(np.sum(x ** 2, axis=1, keepdims=True)) + 1e-10
-        return np.sqrt(x.shape[1]) * x / mx
+        y = super().predict(x)
+        if y is x:
+            # centering/whitening was a no-op, copy so the in-place
+            # normalization below does not modify the caller's array
+            y = x.copy()
+
+        # fused norm reduction + in-place scaling, avoids the (N, D)
+        # temporaries of x**2 and the division
+        norms = np.einsum("ij,ij->i", y, y)
+        np.sqrt(norms, out=norms)
+        norms += 1e-10
+        np.reciprocal(norms, out=norms)
+        norms *= np.sqrt(y.shape[1])
+        y *= norms[:, None]
+        return y
@@ -25,24 +25,118 @@ from .gaussianizer import Gaussianizer
 class TransformList(HypModel):
     """Class to perform a list of transformations"""
 
-    def __init__(self, transforms, **kwargs):
+    def __init__(self, transforms, use_gpu=False, **kwargs):
         super(TransformList, self).__init__(**kwargs)
         if not isinstance(transforms, list):
             transforms = [transforms]
         self.transforms = transforms
+        self.use_gpu = use_gpu
+        self._torch_transform = None
         if transforms is not None:
             self.update_names()
 
     def append(self, t):
         self.transforms.append(t)
+        self._torch_transform = None
         if self.name is not None:
             t.name = self.name + "/" + t.name
 
     def predict(self, x):
+        if self.use_gpu:
+            y = self._predict_torch(x)
+            if y is not None:
+                return y
+
         for t in self.transforms:
             x = t.predict(x)
         return x
 
+    def fuse_affine(self):
+        """Fuses the affine transforms of the list into a single (A, b) pair
+        so the whole chain is applied with one matrix product, with an
+        optional final length normalization.
+
+        Returns (A, b, do_lnorm) or None if some transform cannot be fused.
+        """
+        A = None
+        b = None
+        do_lnorm = False
+        for i, t in enumerate(self.transforms):
+            if isinstance(t, (CentWhitenUP, LNormUP)):
+                # uncertainty propagation transforms are not affine
+                return None
+
+            if isinstance(t, LNorm):
+                if i != len(self.transforms) - 1:
+                    return None
+                do_lnorm = True
+
+            if isinstance(t, (CentWhiten, PCA, LDA, NDA)):
+                A_t = t.T
+                if A_t is not None and A_t.ndim == 1:
+                    A_t = np.diag(A_t)
+                b_t = None if t.mu is None else -t.mu
+                if b_t is not None and A_t is not None:
+                    b_t = np.dot(b_t, A_t)
+            elif isinstance(t, MVN):
+                A_t = None if t.s is None else np.diag(1 / t.s)
+                b_t = None if t.mu is None else -t.mu
+                if b_t is not None and t.s is not None:
+                    b_t = b_t / t.s
+            elif isinstance(t, NAP):
+                A_t = np.eye(t.U.shape[1], dtype=t.U.dtype) - np.dot(t.U.T, t.U)
+                b_t = None
+            else:
+                return None
+
+            if A_t is not None:
+                A = A_t if A is None else np.dot(A, A_t)
+                if b is not None:
+                    b = np.dot(b, A_t)
+            if b_t is not None:
+                b = b_t if b is None else b + b_t
+
+        return A, b, do_lnorm
+
+    def _predict_torch(self, x):
+        if self._torch_transform is False:
+            return None
+
+        try:
+            import torch
+        except ImportError:
+            self._torch_transform = False
+            return None
+
+        if not torch.cuda.is_available():
+            self._torch_transform = False
+            return None
+
+        if self._torch_transform is None:
+            fused = self.fuse_affine()
+            if fused is None:
+                self._torch_transform = False
+                return None
+            A, b, do_lnorm = fused
+            device = torch.device("cuda")
+            A = None if A is None else torch.as_tensor(A, device=device)
+            b = None if b is None else torch.as_tensor(b, device=device)
+            self._torch_transform = (A, b, do_lnorm, device)
+
+        import torch
+
+        A, b, do_lnorm, device = self._torch_transform
+        y = torch.as_tensor(x, device=device)
+        if A is not None:
+            y = torch.matmul(y, A)
+        if b is not None:
+            y = y + b
+        if do_lnorm:
+            mx = torch.norm(y, dim=1, keepdim=True) + 1e-10
+            y = np.sqrt(y.shape[1]) * y / mx
+
+        return y.cpu().numpy()
+
     def update_names(self):
         if self.name is not None:
             for t in self.transforms:
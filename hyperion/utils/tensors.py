@@ -9,18 +9,20 @@ import numpy as np
 def to3D_by_class(x, class_ids, max_length=0):
     dim = x.shape[1]
     num_classes = np.max(class_ids) + 1
+    counts = np.bincount(class_ids, minlength=num_classes)
     if max_length == 0:
-        for i in range(num_classes):
-            num_i = np.sum(class_ids == i)
-            max_length = np.maximum(max_length, num_i)
+        max_length = np.max(counts)
+
+    # a stable sort groups the vectors by class, then one gather and one
+    # scatter replace the O(num_classes) passes over class_ids
+    order = np.argsort(class_ids, kind="stable")
+    row = class_ids[order]
+    col = np.arange(len(class_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
 
     x3d = np.zeros((num_classes, max_length, dim), dtype=x.dtype)
     sample_weight = np.zeros((num_classes, max_length), dtype=x.dtype)
-    for i in range(num_classes):
-        idx = class_ids == i
-        num_i = np.sum(idx)
-        x3d[i, :num_i, :] = x[idx, :]
-        sample_weight[i, :num_i] = 1.0
+    x3d[row, col] = x[order]
+    sample_weight[row, col] = 1.0
 
     return x3d, sample_weight
 
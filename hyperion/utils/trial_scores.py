@@ -9,6 +9,7 @@ import logging
 import copy
 
 import numpy as np
+import pandas as pd
 import h5py
 
 from ..hyp_defs import float_cpu
@@ -88,17 +89,19 @@ class TrialScores(object):
         Args:
           file_path: File to write the list.
         """
+        # gather the valid trials and format all the lines in one C-level
+        # pass instead of one python formatting round-trip per trial
         idx = (self.score_mask.T == True).nonzero()
-        with open(file_path, "w") as f:
-            for item in zip(idx[0], idx[1]):
-                f.write(
-                    "%s %s %f\n"
-                    % (
-                        self.model_set[item[1]],
-                        self.seg_set[item[0]],
-                        self.scores[item[1], item[0]],
-                    )
-                )
+        df = pd.DataFrame(
+            {
+                0: self.model_set[idx[1]],
+                1: self.seg_set[idx[0]],
+                2: self.scores.T[idx],
+            }
+        )
+        df.to_csv(
+            file_path, sep=" ", header=False, index=False, float_format="%f"
+        )
 
     @classmethod
     def load(cls, file_path):
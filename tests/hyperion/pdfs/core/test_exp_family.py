@@ -0,0 +1,43 @@
+"""
+ Copyright 2018 Johns Hopkins University  (Author: Jesus Villalba)
+ Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+"""
+
+import numpy as np
+
+from numpy.testing import assert_allclose
+
+from hyperion.pdfs import Normal
+
+x_dim = 5
+num_samples = 100
+
+
+def create_data():
+    rng = np.random.RandomState(seed=1024)
+    x = rng.randn(num_samples, x_dim)
+    sample_weight = rng.rand(num_samples)
+    return x, sample_weight
+
+
+def test_accum_suff_stats_does_not_mutate_u_x():
+    x, sample_weight = create_data()
+    model = Normal(x_dim=x_dim)
+    u_x = model.compute_suff_stats(x)
+    u_x_0 = u_x.copy()
+
+    N, acc_u_x = model.accum_suff_stats(x, u_x=u_x, sample_weight=sample_weight)
+    assert np.array_equal(u_x, u_x_0)
+    assert_allclose(N, np.sum(sample_weight))
+    assert_allclose(acc_u_x, np.dot(sample_weight, u_x_0))
+
+
+def test_accum_suff_stats_readonly_u_x():
+    x, sample_weight = create_data()
+    model = Normal(x_dim=x_dim)
+    u_x = model.compute_suff_stats(x)
+    u_x.setflags(write=False)
+
+    N, acc_u_x = model.accum_suff_stats(x, u_x=u_x, sample_weight=sample_weight)
+    assert_allclose(N, np.sum(sample_weight))
+    assert_allclose(acc_u_x, np.dot(sample_weight, u_x))